@@ -16,9 +16,28 @@ Layout:
   - Two pages per card: Page 1 = Recto (image), Page 2 = Verso (details)
 """
 
+import functools
+import heapq
 import json
 import os
+import re
 import textwrap
+from typing import Any
+
+try:
+    import orjson  # optional: much faster parsing of the full dump
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional: streaming parse when only LIMIT_COUNT spells are kept
+except ImportError:
+    ijson = None
+
+try:
+    import msgspec  # optional: typed decoding of only the fields the cards use
+except ImportError:
+    msgspec = None
 
 try:
     import scribus
@@ -48,11 +67,16 @@ LIMIT_COUNT = None  # e.g., 60
 EXPORT_PDF = False
 PDF_PATH = "/home/fhoonakker/Dropbox/dvt/projet-PYTHON/spell_cards.pdf"
 
+# Derived layout (computed once, used by every card)
+PAGE_W, PAGE_H = CARD_WIDTH_MM, CARD_HEIGHT_MM
+CONTENT_W = CARD_WIDTH_MM - 2 * MARGIN_MM
+
 
 # ----------------------------
 # HELPER FUNCTIONS
 # ----------------------------
 
+@functools.lru_cache(maxsize=32)
 def _font_or_fallback(name: str) -> str:
     """Return a font that exists in the doc; fallback to default if not installed."""
     try:
@@ -62,6 +86,12 @@ def _font_or_fallback(name: str) -> str:
     return name if name in available else scribus.getDefaultFont()
 
 
+# Resolve fonts once: the font list is application-wide, not per document.
+BODY_FONT = _font_or_fallback(BODY_FONT)
+TITLE_FONT = _font_or_fallback(TITLE_FONT)
+ITALIC_FONT = _font_or_fallback(ITALIC_FONT)
+
+
 def clean_text(s):
     if s is None:
         return ""
@@ -77,6 +107,95 @@ def list_to_str(x):
     return str(x)
 
 
+# 5eTools entry types met by render_entries_plain without a matching structure
+UNKNOWN_ENTRY_TYPES = set()
+
+# Innermost {@tag text|source|display...} markup; nested tags are resolved from the inside out
+RE_5ETOOLS_TAG = re.compile(r"{@(\w+) ?([^{}]*)}")
+
+
+def _tag_text(m):
+    tag, parts = m.group(1), m.group(2).split("|")
+    # display text: 5th field for quickref ({@quickref Cover||3||total cover}), else 3rd if set
+    if tag == "quickref" and len(parts) > 4 and parts[4]:
+        return parts[4]
+    if len(parts) > 2 and parts[2]:
+        return parts[2]
+    return parts[0]
+
+
+def strip_tags(s):
+    """Replace 5eTools inline tags by their display text ({@damage 6d12} -> 6d12)."""
+    while "{@" in s:
+        s, n = RE_5ETOOLS_TAG.subn(_tag_text, s)
+        if not n:
+            break
+    return s
+
+
+def _render_cell(c):
+    if isinstance(c, dict) and ("roll" in c or "entry" in c):
+        roll = c.get("roll") or {}
+        if "exact" in roll:
+            return str(roll["exact"])
+        if "min" in roll or "max" in roll:
+            return "{}-{}".format(roll.get("min", ""), roll.get("max", ""))
+        return render_entries_plain(c.get("entry"))
+    return render_entries_plain(c)
+
+
+def _render_item(it):
+    if isinstance(it, dict) and it.get("name") and ("entries" in it or "entry" in it):
+        body = render_entries_plain(it.get("entries") if "entries" in it else it.get("entry"))
+        return "{}. {}".format(strip_tags(it["name"]), body)
+    return render_entries_plain(it)
+
+
+def render_entries_plain(e):
+    """
+    Flatten 5eTools entries (strings, lists and {"type": ...} blocks) into plain card text,
+    with inline {@...} tags replaced by their display text.
+    Blocks are recognised by their keys, not by "type": translate.py translates the type
+    strings too. Only dicts matching no known shape fall back to JSON, and their type
+    is recorded in UNKNOWN_ENTRY_TYPES.
+    """
+    if e is None:
+        return ""
+    if isinstance(e, str):
+        return strip_tags(e)
+    if isinstance(e, list):
+        return "\n".join(t for t in map(render_entries_plain, e) if t)
+    if not isinstance(e, dict):
+        return str(e)
+
+    name = strip_tags(e["name"]) if isinstance(e.get("name"), str) else ""
+    if "items" in e:  # list
+        return "\n".join("• " + _render_item(it) for it in e["items"] or [])
+    if "rows" in e or "colLabels" in e:  # table
+        lines = [strip_tags(e["caption"])] if e.get("caption") else []
+        if e.get("colLabels"):
+            lines.append(" | ".join(render_entries_plain(c) for c in e["colLabels"]))
+        for row in e.get("rows") or []:
+            cells = row.get("row", []) if isinstance(row, dict) else row
+            lines.append(" | ".join(_render_cell(c) for c in cells))
+        return "\n".join(lines)
+    if "roll" in e:  # table cell
+        return _render_cell(e)
+    if "by" in e:  # quote
+        body = render_entries_plain(e.get("entries"))
+        return "« {} »\n— {}".format(body, strip_tags(e["by"])) if e["by"] else "« {} »".format(body)
+    if "attributes" in e:  # abilityDc / abilityAttackMod
+        attrs = " ou ".join(e["attributes"] or [])
+        if "attack" in str(e.get("type", "")).lower():
+            return "Modificateur d'attaque des sorts = bonus de maîtrise + modificateur de {}".format(attrs)
+        return "DD des sorts = 8 + bonus de maîtrise + modificateur de {}".format(attrs)
+    if "entries" in e or "entry" in e:  # entries, section, inset, item...
+        body = render_entries_plain(e.get("entries") if "entries" in e else e.get("entry"))
+        return "{}\n{}".format(name, body) if name and body else (name or body)
+    UNKNOWN_ENTRY_TYPES.add(e.get("type"))
+    return json.dumps(e, ensure_ascii=False, sort_keys=True)
+
+
 def first_line(s, max_len=120):
     s = clean_text(s)
     return s if len(s) <= max_len else s[: max_len - 1] + "…"
@@ -110,7 +229,7 @@ def derive_meta_lines(sp):
     if duree:   lines.append("• Durée : {}".format(duree))
     if classes: lines.append("• Classes : {}".format(list_to_str(classes)))
     if sp.get("source"):
-        lines.append("• Source : {}".format(sp["source"]))
+        lines.append("• Source : {}".format(sp.get("source")))
     return "\n".join(lines)
 
 
@@ -122,106 +241,203 @@ def get_titles(sp):
 
 
 def get_desc_fr(sp):
-    return clean_text(sp.get("desc_fr") or sp.get("description_fr") or sp.get("entries_fr") or sp.get("desc"))
+    desc = sp.get("desc_fr") or sp.get("description_fr")
+    if desc:
+        return clean_text(desc)
+    entries = sp.get("entries_fr")
+    if entries:
+        return clean_text(render_entries_plain(entries))
+    return clean_text(sp.get("desc") or render_entries_plain(sp.get("entries")))
+
+
+def _spell_sort_key(x):
+    # sort by level then name_fr; computed once per spell by sort()/nsmallest()
+    lvl = x.get("level")
+    if type(lvl) is not int:
+        if lvl is None:
+            lvl = 0  # e.g. Foundry entries: no level, skip the int() exception
+        else:
+            try:
+                lvl = int(lvl)
+            except (TypeError, ValueError):
+                lvl = 0
+    return (lvl, (x.get("name_fr") or x.get("name_en") or x.get("name") or ""))
+
+
+if msgspec is not None:
+    class Spell(msgspec.Struct, kw_only=True, omit_defaults=True):
+        """The spell fields read by the card helpers; every other key is skipped at decode time."""
+        name: Any = None
+        name_fr: Any = None
+        nameFR: Any = None
+        name_en: Any = None
+        level: Any = None
+        school: Any = None
+        school_fr: Any = None
+        time: Any = None
+        time_fr: Any = None
+        range: Any = None
+        range_fr: Any = None
+        components: Any = None
+        components_fr: Any = None
+        duration: Any = None
+        duration_fr: Any = None
+        classes: Any = None
+        classes_fr: Any = None
+        desc: Any = None
+        desc_fr: Any = None
+        description_fr: Any = None
+        entries: Any = None
+        entries_fr: Any = None
+        source: Any = None
+
+        def get(self, key, default=None):
+            """dict-style access, so the helpers accept a Spell or a plain dict."""
+            value = getattr(self, key, None)
+            return default if value is None else value
+
+
+def build_card_columns(spells):
+    """
+    Struct-of-arrays view of the spells: one list per verso text field, computed once
+    before rendering so the Scribus loop only indexes ready-made strings.
+    Returns (titles_fr, titles_en, metas, bodies).
+    """
+    titles_fr, titles_en, metas, bodies = [], [], [], []
+    for sp in spells:
+        title_fr, title_en = get_titles(sp)
+        titles_fr.append(title_fr)
+        titles_en.append(title_en)
+        metas.append(derive_meta_lines(sp))
+        bodies.append(get_desc_fr(sp))
+    return titles_fr, titles_en, metas, bodies
 
 
-def load_spells(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def load_spells(path, limit=None):
+    """
+    Load spells sorted by level then name, keeping only the first `limit` if given.
+    With a limit (and ijson installed) the file is streamed and only the `limit`
+    best spells are kept in memory; otherwise the whole array is parsed and sorted,
+    as Spell structs when msgspec is installed (plain dicts otherwise).
+    """
+    if limit and ijson is not None:
+        with open(path, "rb") as f:
+            # ijson.items() yields nothing for a non-array root: check the first event
+            if next(ijson.parse(f), (None, None, None))[1] != "start_array":
+                raise ValueError("Le JSON doit être un tableau de sorts.")
+            f.seek(0)
+            return heapq.nsmallest(limit, ijson.items(f, "item", use_float=True), key=_spell_sort_key)
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    if msgspec is not None:
+        try:
+            data = msgspec.json.decode(raw, type=list[Spell])
+        except msgspec.ValidationError:
+            raise ValueError("Le JSON doit être un tableau de sorts.")
+    else:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     if not isinstance(data, list):
         raise ValueError("Le JSON doit être un tableau de sorts.")
 
-    # Optional filtering / sorting
-    # Example: sort by level then name_fr
-    def keyf(x):
-        lvl = x.get("level")
-        try:
-            lvl = int(lvl)
-        except Exception:
-            lvl = 0
-        return (lvl, (x.get("name_fr") or x.get("name_en") or x.get("name") or ""))
+    data.sort(key=_spell_sort_key)
+    return data[:limit] if limit else data
 
-    data.sort(key=keyf)
-    return data
 
-
-def ensure_doc(width_mm, height_mm):
+def ensure_doc(width_mm, height_mm, front_image_path):
     if scribus.haveDoc():
         scribus.closeDoc()
     # units=scribus.UNIT_MILLIMETERS, firstPageNumber=1, pages=1, margins L/T/R/B
     scribus.newDocument((width_mm, height_mm), (MARGIN_MM, MARGIN_MM, MARGIN_MM, MARGIN_MM),
                         scribus.PORTRAIT, 1, scribus.UNIT_MILLIMETERS,
                         scribus.FACINGPAGES, scribus.FIRSTPAGERIGHT, 1)
-    # set fonts (fallbacks)
-    global BODY_FONT, TITLE_FONT, ITALIC_FONT
-    BODY_FONT = _font_or_fallback(BODY_FONT)
-    TITLE_FONT = _font_or_fallback(TITLE_FONT)
-    ITALIC_FONT = _font_or_fallback(ITALIC_FONT)
+    create_styles()
+    create_recto_master(front_image_path)
+
+
+RECTO_MASTER = "RectoMaster"
+
+
+def create_recto_master(image_path):
+    """Draw the recto once on a master page; every recto page then just references it."""
+    scribus.createMasterPage(RECTO_MASTER)
+    scribus.editMasterPage(RECTO_MASTER)
+    try:
+        add_recto(image_path)
+    finally:
+        scribus.closeMasterPage()
+
+
+# Card text styles: name -> (font, size, color, fixed line spacing or None for automatic, alignment)
+CARD_STYLES = {
+    "SpellTitle": (TITLE_FONT, 12, "White", None, scribus.ALIGN_CENTERED),
+    "SpellSub": (ITALIC_FONT, 8.5, "White", None, scribus.ALIGN_CENTERED),
+    "SpellMeta": (BODY_FONT, 8.5, "Black", 10.0, scribus.ALIGN_LEFT),
+    "SpellBody": (BODY_FONT, 8.8, "Black", 10.6, scribus.ALIGN_LEFT),
+}
+
+# setParagraphStyle is the 1.5.x+ name; older scripters only have setStyle
+_set_paragraph_style = getattr(scribus, "setParagraphStyle", None) or scribus.setStyle
+
+
+def create_styles():
+    """Define the card paragraph/character styles once, so frames only need a style name."""
+    for name, (font, size, color, spacing, align) in CARD_STYLES.items():
+        features = "smallcaps" if (SMALL_CAPS and name == "SpellTitle") else "inherit"
+        scribus.createCharStyle(name=name + "Char", font=font, fontsize=size,
+                                features=features, fillcolor=color)
+        if spacing is None:
+            scribus.createParagraphStyle(name=name, linespacingmode=1, alignment=align,
+                                         charstyle=name + "Char")
+        else:
+            scribus.createParagraphStyle(name=name, linespacingmode=0, linespacing=spacing,
+                                         alignment=align, charstyle=name + "Char")
+
+
+def add_styled_text(x, y, w, h, text, style):
+    """Create a text frame, fill it and apply one of CARD_STYLES."""
+    frame = scribus.createText(x, y, w, h)
+    scribus.setText(text, frame)
+    _set_paragraph_style(style, frame)
+    return frame
 
 
 def add_recto(image_path):
-    """Create recto page with a full-bleed image."""
+    """Create recto page with a full-bleed image (drawn once, on the recto master page)."""
     # Make sure page exists
     # Fill entire page
-    w, h = CARD_WIDTH_MM, CARD_HEIGHT_MM
-    img = scribus.createImage(0, 0, w, h)
+    img = scribus.createImage(0, 0, PAGE_W, PAGE_H)
     try:
         scribus.loadImage(image_path, img)
         scribus.setScaleImageToFrame(True, True, img)
     except Exception as e:
         # Fallback: colored rectangle if image not found
-        rect = scribus.createRect(0, 0, w, h)
+        rect = scribus.createRect(0, 0, PAGE_W, PAGE_H)
         scribus.setFillColor("Black", rect)
         scribus.setLineColor("None", rect)
     # No text, just image
 
 
-def add_verso(spell):
+def add_verso(title_fr, title_en, meta, body):
     """Create verso page with FR details and dual-language title band."""
-    w, h = CARD_WIDTH_MM, CARD_HEIGHT_MM
-
     # Title band (top)
-    band = scribus.createRect(0, 0, w, TITLE_BAND_HEIGHT)
+    band = scribus.createRect(0, 0, PAGE_W, TITLE_BAND_HEIGHT)
     scribus.setFillColor("Black", band)
     scribus.setLineColor("None", band)
 
     # Title text (FR — big, bold)
-    title_fr, title_en = get_titles(spell)
-    title_frame = scribus.createText(MARGIN_MM, 1.0, w - 2 * MARGIN_MM, TITLE_BAND_HEIGHT - 2.0)
-    scribus.setTextColor("White", title_frame)
-    scribus.setTextAlignment(scribus.ALIGN_CENTERED, title_frame)
-    scribus.setFont(TITLE_FONT, title_frame)
-    scribus.setFontSize(12, title_frame)
-    if SMALL_CAPS:
-        scribus.setSmallCaps(True, title_frame)
-    scribus.insertText(title_fr, -1, title_frame)
+    add_styled_text(MARGIN_MM, 1.0, CONTENT_W, TITLE_BAND_HEIGHT - 2.0, title_fr, "SpellTitle")
 
     # Subtitle (EN)
-    sub_frame = scribus.createText(MARGIN_MM, TITLE_BAND_HEIGHT - 3.8, w - 2 * MARGIN_MM, 3.2)
-    scribus.setTextColor("White", sub_frame)
-    scribus.setTextAlignment(scribus.ALIGN_CENTERED, sub_frame)
-    scribus.setFont(ITALIC_FONT, sub_frame)
-    scribus.setFontSize(8.5, sub_frame)
-    scribus.insertText(title_en, -1, sub_frame)
+    add_styled_text(MARGIN_MM, TITLE_BAND_HEIGHT - 3.8, CONTENT_W, 3.2, title_en, "SpellSub")
 
     # Meta block
-    meta = derive_meta_lines(spell)
-    meta_frame = scribus.createText(MARGIN_MM, TITLE_BAND_HEIGHT + 1.5, w - 2 * MARGIN_MM, 22.0)
-    scribus.setText(meta, meta_frame)
-    scribus.setFont(BODY_FONT, meta_frame)
-    scribus.setFontSize(8.5, meta_frame)
-    scribus.setLineSpacing(10.0, meta_frame)
+    add_styled_text(MARGIN_MM, TITLE_BAND_HEIGHT + 1.5, CONTENT_W, 22.0, meta, "SpellMeta")
 
     # Body (FR description)
     body_top = TITLE_BAND_HEIGHT + 1.5 + 22.0 + 1.5
-    body_h = h - body_top - MARGIN_MM
-    body = get_desc_fr(spell)
-    body_frame = scribus.createText(MARGIN_MM, body_top, w - 2 * MARGIN_MM, body_h)
-    scribus.setText(body, body_frame)
-    scribus.setFont(BODY_FONT, body_frame)
-    scribus.setFontSize(8.8, body_frame)
-    scribus.setLineSpacing(10.6, body_frame)
-    scribus.setTextAlignment(scribus.ALIGN_LEFT, body_frame)
+    body_h = PAGE_H - body_top - MARGIN_MM
+    add_styled_text(MARGIN_MM, body_top, CONTENT_W, body_h, body, "SpellBody")
 
 
 def main():
@@ -235,16 +451,15 @@ def main():
                            "Image de recto introuvable (un rectangle noir sera utilisé):\n{}".format(FRONT_IMAGE_PATH),
                            scribus.ICON_WARNING, scribus.BUTTON_OK)
 
-    spells = load_spells(JSON_INPUT_PATH)
-    if LIMIT_COUNT:
-        spells = spells[:LIMIT_COUNT]
+    spells = load_spells(JSON_INPUT_PATH, LIMIT_COUNT)
 
-    ensure_doc(CARD_WIDTH_MM, CARD_HEIGHT_MM)
+    ensure_doc(CARD_WIDTH_MM, CARD_HEIGHT_MM, FRONT_IMAGE_PATH)
 
     # Page 1 already exists in newDocument; we will reuse it for the first recto.
     # For each spell, make: recto page, verso page
+    titles_fr, titles_en, metas, bodies = build_card_columns(spells)
     total = len(spells)
-    for idx, sp in enumerate(spells, 1):
+    for idx, card in enumerate(zip(titles_fr, titles_en, metas, bodies), 1):
         # --- Recto
         if idx == 1:
             # first page exists
@@ -252,11 +467,11 @@ def main():
             scribus.deletePageItem = None  # no-op; keep empty
         else:
             scribus.newPage(-1)
-        add_recto(FRONT_IMAGE_PATH)
+        scribus.applyMasterPage(RECTO_MASTER, scribus.currentPage())
 
         # --- Verso
         scribus.newPage(-1)
-        add_verso(sp)
+        add_verso(*card)
 
         # Progress feedback
         if idx % 20 == 0 or idx == total:
@@ -286,8 +501,11 @@ def main():
             scribus.messageBox("Erreur PDF", "Export PDF échoué:\n{}".format(e), scribus.ICON_WARNING,
                                scribus.BUTTON_OK)
 
-    scribus.messageBox("Terminé", "Génération terminée.\n{} cartes ({} pages)".format(total, total * 2),
-                       scribus.ICON_NONE, scribus.BUTTON_OK)
+    done = "Génération terminée.\n{} cartes ({} pages)".format(total, total * 2)
+    if UNKNOWN_ENTRY_TYPES:
+        done += "\nTypes d'entrées non rendus (JSON brut) : {}".format(
+            ", ".join(sorted(map(str, UNKNOWN_ENTRY_TYPES))))
+    scribus.messageBox("Terminé", done, scribus.ICON_NONE, scribus.BUTTON_OK)
 
 
 if __name__ == "__main__":
@@ -1,25 +1,55 @@
 # -*- coding: utf-8 -*-
 """
 Collecte des sorts 5eTools depuis le miroir GitHub, agrégation et export CSV/JSON.
-Dépendances: requests, pandas (optionnelle mais pratique pour le CSV).
-> pip install requests pandas
+Dépendances: requests, orjson (optionnelle, JSON plus rapide).
+> pip install requests orjson
 """
 
+import csv
 import json
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson optionnel : repli sur json (stdlib)
+    orjson = None
 
 GITHUB_API_DIR = "https://api.github.com/repos/5etools-mirror-3/5etools-src/contents/data/spells"
 OUT_DIR = Path("5etools_spells_dump")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
+MAX_WORKERS = 8  # téléchargements simultanés
+PRETTY_JSON = True  # False : spells_5etools_full.json compact (écriture plus rapide, fichier plus petit)
+
+
+def make_session():
+    """
+    Session HTTP partagée : connexions keep-alive réutilisées entre les threads,
+    et réessais automatiques (avec backoff) sur 429/502/503 au lieu d'un throttle fixe.
+    GITHUB_TOKEN (optionnel) relève la limite de requêtes de l'API GitHub.
+    """
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 502, 503])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    token = os.getenv("GITHUB_TOKEN")
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
+SESSION = make_session()
 
 
 def list_spell_json_files():
     """Retourne la liste des items (avec download_url) du dossier data/spells/."""
-    r = requests.get(GITHUB_API_DIR, timeout=30)
+    r = SESSION.get(GITHUB_API_DIR, timeout=30)
     r.raise_for_status()
     items = r.json()
     # On garde uniquement les .json “spells-*.json”
@@ -28,9 +58,10 @@ def list_spell_json_files():
 
 def fetch_json(url):
     """Télécharge un JSON brut via une URL de type download_url renvoyée par l’API GitHub."""
-    r = requests.get(url, timeout=60)
+    r = SESSION.get(url, timeout=60)
     r.raise_for_status()
-    return r.json()
+    # orjson décode directement les octets reçus (le décodeur stdlib de requests est bien plus lent)
+    return orjson.loads(r.content) if orjson is not None else r.json()
 
 
 def extract_spells_from_payload(payload, source_filename=None):
@@ -58,63 +89,95 @@ def extract_spells_from_payload(payload, source_filename=None):
     return spells
 
 
+CSV_COLUMNS = ["name", "level", "school", "time", "range", "components", "duration", "classes",
+               "source", "_src_file", "_book"]
+
+
+def _join_time(ts):
+    if not isinstance(ts, list):
+        return ts
+    return "; ".join(f'{t.get("number", "")} {t.get("unit", "")}'.strip() for t in ts)
+
+
+def _join_duration(ds):
+    if not isinstance(ds, list):
+        return ds
+    return "; ".join(d.get("type", "") for d in ds)
+
+
 def flatten_for_csv(spell):
     """
     Prépare un dict “plat” minimal pour le CSV. Le JSON complet est conservé séparément.
     Les clés varient selon les versions (PHB'14 vs PHB'24). On gère les plus communes.
     """
+    rng = spell.get("range")
+    comps = spell.get("components")
+    classes = spell.get("classes")
     return {
         "name": spell.get("name"),
         "level": spell.get("level"),
         "school": spell.get("school"),
-        "time": "; ".join(
-            f'{t.get("number", "")} {t.get("unit", "")}'.strip()
-            for t in spell.get("time", [])
-        ) if isinstance(spell.get("time"), list) else spell.get("time"),
-        "range": spell.get("range", {}).get("distance", {}).get("amount")
-        if isinstance(spell.get("range"), dict) else spell.get("range"),
-        "components": ",".join(sorted(k for k, v in spell.get("components", {}).items() if v is True))
-        if isinstance(spell.get("components"), dict) else spell.get("components"),
-        "duration": "; ".join(
-            d.get("type", "") for d in spell.get("duration", [])
-        ) if isinstance(spell.get("duration"), list) else spell.get("duration"),
-        "classes": ", ".join(spell.get("classes", {}).get("fromClassList", []))
-        if isinstance(spell.get("classes"), dict) else None,
+        "time": _join_time(spell.get("time")),
+        "range": rng.get("distance", {}).get("amount") if isinstance(rng, dict) else rng,
+        "components": ",".join(sorted(k for k, v in comps.items() if v is True))
+        if isinstance(comps, dict) else comps,
+        "duration": _join_duration(spell.get("duration")),
+        "classes": ", ".join(classes.get("fromClassList", [])) if isinstance(classes, dict) else None,
         "source": spell.get("source"),
         "_src_file": spell.get("_src_file"),
         "_book": spell.get("_book"),
     }
 
 
+def _csv_sort_key(row):
+    # niveau puis nom ; les entrées sans niveau (Foundry) en dernier
+    return (row["level"] is None, row["level"] or 0, row["name"] or "")
+
+
+def write_csv(all_spells, path):
+    """Écrit le CSV simplifié en flux (csv.DictWriter), trié par niveau puis nom."""
+    rows_sorted = sorted((flatten_for_csv(s) for s in all_spells), key=_csv_sort_key)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        w = csv.DictWriter(f, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        w.writeheader()
+        w.writerows(rows_sorted)
+
+
 def main():
     files = list_spell_json_files()
     print(f"Fichiers de sorts trouvés: {len(files)}")
 
+    files = [it for it in files if it.get("download_url")]
+    spells_by_file = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {ex.submit(fetch_json, it["download_url"]): it for it in files}
+        for i, fut in enumerate(as_completed(futures), 1):
+            name = futures[fut].get("name")
+            spells = extract_spells_from_payload(fut.result(), source_filename=name)
+            print(f"[{i}/{len(files)}] Téléchargé: {name} -> {len(spells)} sorts")
+            spells_by_file[name] = spells
+
+    # Agrégation dans l'ordre du listing GitHub (sortie déterministe)
     all_spells = []
-    for i, it in enumerate(files, 1):
-        url = it.get("download_url")
-        name = it.get("name")
-        if not url:
-            continue
-        print(f"[{i}/{len(files)}] Téléchargement: {name}")
-        payload = fetch_json(url)
-        spells = extract_spells_from_payload(payload, source_filename=name)
-        print(f"  -> {len(spells)} sorts")
-        all_spells.extend(spells)
-        # Doux throttle pour ne pas heurter les limites non authentifiées
-        time.sleep(0.3)
+    for it in files:
+        all_spells.extend(spells_by_file[it.get("name")])
 
     print(f"Total sorts agrégés: {len(all_spells)}")
 
     # Sauvegarde JSON “complet”
-    with open(OUT_DIR / "spells_5etools_full.json", "w", encoding="utf-8") as f:
-        json.dump(all_spells, f, ensure_ascii=False, indent=2)
+    full_path = OUT_DIR / "spells_5etools_full.json"
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if PRETTY_JSON else 0)
+        full_path.write_bytes(orjson.dumps(all_spells, option=option))
+    else:
+        with open(full_path, "w", encoding="utf-8") as f:
+            if PRETTY_JSON:
+                json.dump(all_spells, f, ensure_ascii=False, indent=2)
+            else:
+                json.dump(all_spells, f, ensure_ascii=False, separators=(",", ":"))
 
     # Sauvegarde CSV simplifié
-    rows = [flatten_for_csv(s) for s in all_spells]
-    df = pd.DataFrame(rows)
-    df.sort_values(by=["level", "name"], inplace=True, ignore_index=True)
-    df.to_csv(OUT_DIR / "spells_5etools_min.csv", index=False, encoding="utf-8")
+    write_csv(all_spells, OUT_DIR / "spells_5etools_min.csv")
     print(f"Fichiers écrits dans: {OUT_DIR.resolve()}")
 
 
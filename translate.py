@@ -9,7 +9,10 @@ Caractéristiques :
 - Protège tokens : [[...]], {@...}, @item.*, dés XdY, /save...
 - Traduit certains enums via mapping : activities[].type, activation.type, damage.onSave, effects[].statuses
 - Glossaire FR léger sur noms/descriptions
-- DeepL avec cache et batching
+- DeepL avec cache et batching (lots envoyés en parallèle, httpx / HTTP/2 si h2 est installé)
+- Entrée lue en flux par groupes de sorts (ijson si installé), sortie écrite au fil de l'eau
+- Reprise : chaque sort de sortie porte l'empreinte de sa source (_src_hash) ; un sort inchangé
+  depuis le run précédent est recopié depuis l'ancienne sortie, sans retraitement
 
 Variables d'env :
 - TRANSLATE_PROVIDER=deepl (obligatoire : ce script est paramétré pour DeepL)
@@ -22,38 +25,91 @@ import os
 import re
 import json
 import time
+import random
+import asyncio
 import argparse
 import hashlib
+import itertools
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from xml.sax.saxutils import escape as xml_escape, unescape as xml_unescape
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple, Union
 
-import requests
+import httpx
 from tqdm import tqdm
 
+try:
+    import h2  # noqa: F401  (requis par httpx pour HTTP/2)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+try:
+    import orjson
+except ImportError:  # orjson optionnel : repli sur json (stdlib)
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson optionnel : sans lui, l'entrée est lue d'un bloc
+    ijson = None
+
 # ---------------------- Réglages généraux ----------------------
 DEFAULT_SRC = "EN"
 DEFAULT_TGT = "FR"
 BATCH_SIZE = 30  # segments par appel
-SLEEP = 0.6  # pause entre appels pour éviter 429
-CACHE_PATH = Path("translate_cache.json")
+GROUP_SIZE = 200  # sorts lus, traduits puis écrits ensemble (mémoire bornée sur les gros dumps)
+MAX_CONCURRENCY = 8  # requêtes DeepL simultanées (reste sous la limite de concurrence du compte)
+MAX_RETRIES = 5  # réessais d'un lot refusé pour surcharge (429 / 503)
+RETRY_BASE_DELAY = 1.0  # secondes ; doublé à chaque réessai si l'API ne donne pas Retry-After
+RETRY_JITTER = 0.5  # secondes aléatoires ajoutées à chaque attente (évite les réessais synchronisés)
+RETRY_STATUSES = frozenset({429, 503})
+RATE_START = 5.0  # requêtes/s au démarrage (ajusté ensuite par RateLimiter)
+RATE_MIN = 0.5
+RATE_MAX = 20.0
+CACHE_PATH = Path("translate_cache.json")  # snapshot consolidé (fin de run)
+CACHE_LOG_PATH = Path("translate_cache.jsonl")  # journal append-only pendant le run
+LEGACY_CACHE_PATH = Path("translate_cache.json.bak")  # ancien cache indexé par sha256 (lecture seule)
+SRC_HASH_KEY = "_src_hash"  # empreinte du sort source, écrite dans chaque sort de sortie
 
 # ---------------------- Zones à ignorer ------------------------
 # Clés dont on NE traduit pas les valeurs (identifiants, codes, etc.)
-SKIP_VALUE_KEYS = {
+SKIP_VALUE_KEYS = frozenset({
     "foundryId", "uuid", "id", "img", "icon", "iconPath", "tag", "tags",
     "slug", "key", "module", "pack", "path", "file",
     "source", "sources",  # code/source de livre
+    "_src_file", "_book",  # fichier et livre d'origine ajoutés par le dump
+    "name_en",  # nom original conservé tel quel
+    SRC_HASH_KEY,
     "duration.seconds",
     "dc.calculation", "calculation",
     "mode", "denomination", "number",
     "school", "level", "scaling", "target.affects.count",
     "ability", "abilities",  # codes d'abilités (str courts)
     # NOTE: on NE met PAS "type" ici : on veut le traduire via ENUM_MAP
-}
+})
 # Sous-arbres entiers à ne pas traduire
-SKIP_SUBTREES = {
+SKIP_SUBTREES = frozenset({
     "system",  # bloc technique Foundry
-}
+})
+# Valeurs non textuelles ou déjà en français : jamais envoyées à l'API
+RE_NON_TEXT = re.compile(r"[\d\W_]+")  # nombres, ponctuation, symboles
+# Chemins, URL et noms de fichier sans espace ("icons/magic/x.webp", "spells-phb.json") ;
+# un "/" seul ne suffit pas : "Antipathy/Sympathy" est un vrai nom de sort
+RE_PATH_LIKE = re.compile(r"\S*://\S*|\S*\.[A-Za-z0-9]{2,5}|[a-z0-9_.-]+(?:/[a-z0-9_.-]+)+/?")
+FR_DIACRITICS = frozenset("àâäéèêëîïôöùûüçÀÂÄÉÈÊËÎÏÔÖÙÛÜÇ")
+# Une chaîne préparée composée uniquement de ces caractères ne contient que des placeholders
+PLACEHOLDER_CHARS = " \t\n§T0123456789"
+
+
+def is_translatable(s: str) -> bool:
+    if len(s) < 2 or s.isdigit():
+        return False
+    if len(s) <= 3 and s.isupper():  # codes courts : V, S, M, AC...
+        return False
+    if RE_NON_TEXT.fullmatch(s) or RE_PATH_LIKE.fullmatch(s):
+        return False
+    return FR_DIACRITICS.isdisjoint(s)
+
 
 # ---------------------- Tokens à protéger ----------------------
 RE_FOUNDRY_BLOCK = re.compile(r"\[\[.*?\]\]")  # [[ ... ]]
@@ -61,50 +117,207 @@ RE_5ETOOLS_TAG = re.compile(r"{@[^{}]+}")  # {@...}
 RE_AT_TOKEN = re.compile(r"@[A-Za-z0-9_.\[\]-]+")  # @item.level, @abilities.con.mod, etc.
 RE_DICE = re.compile(r"\b\d+d\d+([+-]\d+)?\b")  # 3d8, 2d6+3
 RE_COMMAND = re.compile(r"/[a-zA-Z]+")  # /save, /roll, ...
+# Une seule passe : alternance des motifs ci-dessus, dans le même ordre de priorité
+RE_TOKEN = re.compile("|".join(
+    f"(?:{r.pattern})" for r in (RE_FOUNDRY_BLOCK, RE_5ETOOLS_TAG, RE_AT_TOKEN, RE_DICE, RE_COMMAND)
+))
+# Au moins un de ces caractères est nécessaire pour qu'un token soit présent
+TOKEN_CHARS = frozenset("[{@/0123456789")
 
 
 def protect_tokens(text: str) -> Tuple[str, List[str]]:
-    if not text:
-        return "", []
+    # text est toujours une str (collect_strings ne collecte que des str) ; "" passe ici aussi
+    if TOKEN_CHARS.isdisjoint(text):
+        return text, []
     tokens: List[str] = []
-    out = text
-    for regex in (RE_FOUNDRY_BLOCK, RE_5ETOOLS_TAG, RE_AT_TOKEN, RE_DICE, RE_COMMAND):
-        def _sub(m):
-            token = f"§§T{len(tokens)}§§"
-            tokens.append(m.group(0))
-            return token
 
-        out = regex.sub(_sub, out)
-    return out, tokens
+    def _sub(m):
+        token = f"§§T{len(tokens)}§§"
+        tokens.append(m.group(0))
+        return token
+
+    return RE_TOKEN.sub(_sub, text), tokens
+
+
+RE_PLACEHOLDER = re.compile(r"§§T(0|[1-9][0-9]*)§§")
 
 
 def restore_tokens(text: str, tokens: List[str]) -> str:
-    out = text
-    for i, tok in enumerate(tokens):
-        out = out.replace(f"§§T{i}§§", tok)
-    return out
+    if not tokens:
+        return text
+    n = len(tokens)
+
+    def _sub(m):
+        i = int(m.group(1))
+        return tokens[i] if i < n else m.group(0)  # index inventé par l'API : laissé tel quel
+
+    return RE_PLACEHOLDER.sub(_sub, text)
+
+
+RE_WS = re.compile(r"[ \t]+")
 
 
 def norm_ws(s: str) -> str:
-    return re.sub(r"[ \t]+", " ", (s or "").replace("\r\n", "\n")).strip()
+    if "\r" in s:
+        s = s.replace("\r\n", "\n")
+    # Cas courant : ni tabulation ni double espace, la regex ne changerait rien
+    if "\t" not in s and "  " not in s:
+        return s.strip()
+    return RE_WS.sub(" ", s).strip()
 
 
-# ---------------------- Cache ----------------------
-def load_cache() -> Dict[str, str]:
-    if CACHE_PATH.exists():
-        try:
-            return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+# Version compilée des trois fonctions ci-dessus (translate_fast.pyx), si elle a été construite
+try:
+    from translate_fast import protect_tokens, restore_tokens, norm_ws  # noqa: F811
+except ImportError:
+    pass
+
+
+# ---------------------- JSON ----------------------
+def json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_line(obj: Any) -> bytes:
+    """Une ligne JSONL compacte (avec saut de ligne final)."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    return json_loads(Path(path).read_bytes())
 
 
-def save_cache(cache: Dict[str, str]) -> None:
-    CACHE_PATH.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+def json_array_item(obj: Any) -> bytes:
+    """Élément de tableau mis en forme comme write_json(indent=True) l'écrit dans la liste."""
+    if orjson is not None:
+        raw = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return b"  " + raw.replace(b"\n", b"\n  ")
+
+
+def iter_json_array(path: Union[str, Path]) -> Iterator[Any]:
+    """Éléments du tableau racine, un à un (en flux avec ijson, sinon après lecture complète)."""
+    if ijson is None:
+        data = read_json(path)
+        if not isinstance(data, list):
+            raise RuntimeError("Le JSON racine doit être une liste (array).")
+        yield from data
+        return
+    with open(path, "rb") as f:
+        if next(ijson.parse(f), (None, None, None))[1] != "start_array":
+            raise RuntimeError("Le JSON racine doit être une liste (array).")
+        f.seek(0)
+        yield from ijson.items(f, "item", use_float=True)
+
+
+def write_json(path: Union[str, Path], data: Any, indent: bool = True) -> None:
+    """indent=False : JSON compact, nettement plus rapide à écrire (fichiers non destinés à la lecture)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        Path(path).write_bytes(orjson.dumps(data, option=option))
+    else:
+        text = json.dumps(data, ensure_ascii=False, **({"indent": 2} if indent else {"separators": (",", ":")}))
+        Path(path).write_text(text, encoding="utf-8")
 
 
-def cache_key(provider: str, src: str, tgt: str, text: str) -> str:
-    return hashlib.sha256(f"{provider}|{src}|{tgt}|{text}".encode("utf-8")).hexdigest()
+# ---------------------- Cache ----------------------
+# Clé = tuple (provider, src, tgt, texte préparé) : aucun hachage à calculer, le hash de str
+# suffit. Sur disque, chaque entrée est un enregistrement [p, s, t, x, y] (snapshot CACHE_PATH)
+# ou une ligne {"p", "s", "t", "x", "y"} (journal CACHE_LOG_PATH), x = source, y = traduction.
+# Pendant un run, chaque lot traduit est ajouté au journal (O(lot) par écriture, résiste à un
+# crash) ; save_cache() consolide le tout dans CACHE_PATH et supprime le journal.
+#
+# Un CACHE_PATH de l'ancien format (dict sha256 -> traduction) est renommé en LEGACY_CACHE_PATH
+# au lieu d'être écrasé, puis consulté en lecture seule sur les absences (legacy_lookup).
+CacheKey = Tuple[str, str, str, str]
+Cache = Dict[CacheKey, str]
+_CACHE_LOG = None  # handle du journal, ouvert à la première écriture
+_LEGACY_CACHE: Dict[str, str] = {}  # ancien cache, chargé par load_cache
+
+
+def _read_legacy_cache() -> Dict[str, str]:
+    try:
+        legacy = read_json(LEGACY_CACHE_PATH)
+    except Exception:
+        return {}
+    return legacy if isinstance(legacy, dict) else {}
+
+
+def load_cache() -> Cache:
+    global _LEGACY_CACHE
+    cache: Cache = {}
+    records: Any = []
+    if CACHE_PATH.exists():
+        try:
+            records = read_json(CACHE_PATH)
+        except Exception:
+            records = []
+    if isinstance(records, dict):
+        # Ancien format : mis de côté (fusionné à un .bak existant), le snapshot ne l'écrase pas
+        if LEGACY_CACHE_PATH.exists():
+            records = {**_read_legacy_cache(), **records}
+            tmp = LEGACY_CACHE_PATH.with_name(LEGACY_CACHE_PATH.name + ".tmp")
+            write_json(tmp, records, indent=False)
+            os.replace(tmp, LEGACY_CACHE_PATH)
+            CACHE_PATH.unlink()
+        else:
+            os.replace(CACHE_PATH, LEGACY_CACHE_PATH)
+        records = []
+    elif isinstance(records, list):
+        for rec in records:
+            try:
+                p, src, tgt, x, y = rec
+                cache[(p, src, tgt, x)] = y
+            except (TypeError, ValueError):
+                continue  # enregistrement malformé : ignoré, comme une ligne de journal invalide
+    _LEGACY_CACHE = _read_legacy_cache() if LEGACY_CACHE_PATH.exists() else {}
+    if CACHE_LOG_PATH.exists():
+        with CACHE_LOG_PATH.open("rb") as f:
+            for line in f:
+                try:
+                    e = json_loads(line)
+                    cache[(e["p"], e["s"], e["t"], e["x"])] = e["y"]
+                except (ValueError, KeyError, TypeError):
+                    continue  # ligne tronquée (run interrompu) ou ancien format
+    return cache
+
+
+def legacy_lookup(provider: str, src: str, tgt: str, text: str) -> Union[str, None]:
+    """
+    Traduction de l'ancien cache (clé sha256), seulement pour un texte sans placeholder :
+    avant la correction du stockage brut, ces entrées-là contenaient les tokens d'un autre sort.
+    """
+    if not _LEGACY_CACHE or "§§T" in text:
+        return None
+    hit = _LEGACY_CACHE.get(hashlib.sha256(f"{provider}|{src}|{tgt}|{text}".encode("utf-8")).hexdigest())
+    return hit if isinstance(hit, str) else None
+
+
+def append_cache(entries: Cache) -> None:
+    global _CACHE_LOG
+    if _CACHE_LOG is None:
+        _CACHE_LOG = CACHE_LOG_PATH.open("ab")
+    for (p, src, tgt, x), y in entries.items():
+        _CACHE_LOG.write(json_line({"p": p, "s": src, "t": tgt, "x": x, "y": y}))
+    _CACHE_LOG.flush()
+
+
+def save_cache(cache: Cache) -> None:
+    global _CACHE_LOG
+    if _CACHE_LOG is None and not CACHE_LOG_PATH.exists() and CACHE_PATH.exists():
+        return  # rien de neuf depuis le dernier snapshot : pas de réécriture
+    tmp = CACHE_PATH.with_name(CACHE_PATH.name + ".tmp")
+    write_json(tmp, [[*k, v] for k, v in cache.items()], indent=False)
+    os.replace(tmp, CACHE_PATH)
+    if _CACHE_LOG is not None:
+        _CACHE_LOG.close()
+        _CACHE_LOG = None
+    CACHE_LOG_PATH.unlink(missing_ok=True)
 
 
 # ---------------------- DeepL ----------------------
@@ -113,6 +326,20 @@ class DeepLTranslator:
         self.api_key = api_key
         self.src = src
         self.tgt = tgt
+        # Ouverts par `async with translator:` et partagés par tous les lots du run
+        self.client: Union[httpx.AsyncClient, None] = None
+        self.limiter: Union["RateLimiter", None] = None
+        self.sem: Union[asyncio.Semaphore, None] = None
+
+    async def __aenter__(self) -> "DeepLTranslator":
+        self.client = self.make_client()
+        self.limiter = RateLimiter()
+        self.sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.client.aclose()
+        self.client = self.limiter = self.sem = None
 
     def _endpoint(self) -> str:
         base = os.getenv("DEEPL_API_BASE", "").strip().rstrip("/")
@@ -123,19 +350,104 @@ class DeepLTranslator:
             return "https://api-free.deepl.com/v2/translate"
         return "https://api.deepl.com/v2/translate"
 
-    def translate_batch(self, texts: List[str]) -> List[str]:
-        ep = self._endpoint()
-        form = [("text", t) for t in texts]
-        params = {"source_lang": self.src, "target_lang": self.tgt, "preserve_formatting": "1"}
-        headers = {
-            "Authorization": f"DeepL-Auth-Key {self.api_key}",
-            "Content-Type": "application/x-www-form-urlencoded",
+    def make_client(self) -> httpx.AsyncClient:
+        """Client unique pour tout le run : une connexion (HTTP/2 multiplexé si possible)."""
+        return httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=60.0,
+            headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
+        )
+
+    async def translate_batch_async(self, texts: List[str]) -> List[str]:
+        params = {
+            "source_lang": self.src,
+            "target_lang": self.tgt,
+            "preserve_formatting": "1",
+            # Placeholders envoyés comme balises <x> que DeepL recopie sans les traduire
+            "tag_handling": "xml",
+            "ignore_tags": "x",
+            "outline_detection": "0",
         }
-        r = requests.post(ep, data=form, params=params, headers=headers, timeout=60)
+        data = {"text": [to_deepl_xml(t) for t in texts]}
+        r = await self.client.post(self._endpoint(), data=data, params=params)
+        if r.status_code in RETRY_STATUSES:
+            # Surcharge : pas fatal, l'appelant ralentit et renvoie le même lot
+            raise RateLimited(r.status_code, retry_after(r))
         if r.status_code >= 400:
             raise RuntimeError(f"DeepL HTTP {r.status_code}: {r.text[:400]}")
-        js = r.json()
-        return [it["text"] for it in js.get("translations", [])]
+        js = json_loads(r.content)
+        return [from_deepl_xml(it["text"]) for it in js.get("translations", [])]
+
+
+# Balisage natif DeepL : §§T{i}§§ <-> <x>{i}</x> (texte échappé en XML). Le moteur peut
+# altérer des § ou traduire le T ; une balise ignorée (ignore_tags) lui reste opaque.
+# Le reste du pipeline et le cache gardent la forme §§T{i}§§.
+RE_XML_PLACEHOLDER = re.compile(r"<x>(0|[1-9][0-9]*)</x>")
+
+
+def to_deepl_xml(text: str) -> str:
+    return RE_PLACEHOLDER.sub(r"<x>\1</x>", xml_escape(text))
+
+
+def from_deepl_xml(text: str) -> str:
+    return xml_unescape(RE_XML_PLACEHOLDER.sub(r"§§T\1§§", text), {"&quot;": '"', "&apos;": "'"})
+
+
+class RateLimited(RuntimeError):
+    """Lot refusé par DeepL pour surcharge (429 / 503) : il peut être renvoyé tel quel."""
+
+    def __init__(self, status: int, retry_after: Union[float, None]):
+        super().__init__(f"DeepL HTTP {status}")
+        self.retry_after = retry_after
+
+
+def retry_after(r: httpx.Response) -> Union[float, None]:
+    try:
+        return float(r.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Débit client adaptatif (AIMD) : seau à jetons remplis à `rate` requêtes/s.
+    Succès -> rate * 1.05 (plafonné à max_rate) ; 429 -> rate * 0.5, puis attente
+    Retry-After (ou backoff exponentiel) + gigue avant de renvoyer le lot.
+    """
+
+    def __init__(self, rate: float = RATE_START, min_rate: float = RATE_MIN, max_rate: float = RATE_MAX):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = 1.0
+        self._stamp = time.monotonic()
+        self._backoff_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                # Capacité du seau : une seconde de débit (au moins une requête)
+                self.tokens = min(max(1.0, self.rate), self.tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate * 1.05)
+
+    async def on_throttle(self, retry_after: Union[float, None], attempt: int) -> None:
+        delay = retry_after if retry_after is not None else RETRY_BASE_DELAY * 2 ** attempt
+        now = time.monotonic()
+        # Les requêtes en vol refusées pendant la même attente ne divisent le débit qu'une fois
+        if now >= self._backoff_until:
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._backoff_until = now + delay
+        self.tokens = 0.0
+        await asyncio.sleep(delay + random.random() * RETRY_JITTER)
 
 
 def make_translator() -> DeepLTranslator:
@@ -151,64 +463,125 @@ def make_translator() -> DeepLTranslator:
 
 
 # ---------------------- Traduction par lots ----------------------
-def translate_segments(translator: DeepLTranslator, segs: List[str], cache: Dict[str, str]) -> List[str]:
+async def gather_translations(translator: DeepLTranslator, texts: List[str], keys: List[CacheKey],
+                              raw: List[Union[str, None]], cache: Cache) -> None:
+    """
+    Traduit `texts` par lots de BATCH_SIZE, jusqu'à MAX_CONCURRENCY requêtes en vol sur le
+    client du traducteur (ouvert une fois pour le run), au débit réglé par son RateLimiter,
+    et écrit les résultats dans `raw` et dans le cache sous `keys` (mêmes index que `texts`).
+    Un lot refusé pour surcharge est renvoyé (MAX_RETRIES fois au plus).
+    Chaque lot est journalisé (append_cache) ; la consolidation se fait en fin de process_file.
+    """
+    sem, limiter = translator.sem, translator.limiter
+
+    async def _run(start: int) -> None:
+        part = texts[start:start + BATCH_SIZE]
+        for attempt in range(MAX_RETRIES + 1):
+            await limiter.acquire()
+            try:
+                async with sem:
+                    translated = await translator.translate_batch_async(part)
+            except RateLimited as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                await limiter.on_throttle(e.retry_after, attempt)
+                continue
+            limiter.on_success()
+            break
+        fresh: Cache = {}
+        for j, tr in enumerate(translated):
+            raw[start + j] = tr
+            fresh[keys[start + j]] = tr
+        cache.update(fresh)
+        append_cache(fresh)
+
+    await asyncio.gather(*(_run(start) for start in range(0, len(texts), BATCH_SIZE)))
+
+
+def prepare_segments(segs: List[str]) -> Tuple[List[str], List[List[str]]]:
+    """Normalise les espaces et protège les tokens : (textes préparés, tokens de chacun)."""
     prepared: List[str] = []
     tokenlists: List[List[str]] = []
     for s in segs:
-        s = norm_ws(s)
-        p, toks = protect_tokens(s)
+        p, toks = protect_tokens(norm_ws(s))
         prepared.append(p)
         tokenlists.append(toks)
-
-    results: List[Union[str, None]] = [None] * len(prepared)
-    to_call: List[str] = []
-    idxs: List[int] = []
-
+    return prepared, tokenlists
+
+
+async def translate_segments(translator: DeepLTranslator, prepared: List[str],
+                             tokenlists: List[List[str]], cache: Cache) -> List[str]:
+    """Traduit des segments passés par prepare_segments ; renvoie les textes restaurés."""
+    # Pré-dimensionné et rempli par index ; "" si DeepL n'a rien renvoyé pour un segment
+    results: List[str] = [""] * len(prepared)
+    # Segments absents du cache, dédupliqués : chaque chaîne préparée n'est envoyée qu'une fois
+    uniq: Dict[str, int] = {}
+    uniq_list: List[str] = []
+    uniq_keys: List[CacheKey] = []  # clé calculée au lookup, réutilisée pour stocker la traduction
+    pending: List[int] = []
+
+    # Constantes de la clé lues une fois (variables locales dans la boucle)
+    provider, src, tgt = "deepl", translator.src, translator.tgt
+    cache_get = cache.get
+    migrated: Cache = {}  # entrées reprises de l'ancien cache, réécrites au nouveau format
     for i, s in enumerate(prepared):
-        key = cache_key("deepl", translator.src, translator.tgt, s)
-        if s and key in cache:
-            results[i] = restore_tokens(cache[key], tokenlists[i])
+        if not s.strip(PLACEHOLDER_CHARS):  # vide ou uniquement des tokens protégés
+            results[i] = restore_tokens(s, tokenlists[i])
+            continue
+        key = (provider, src, tgt, s)
+        hit = cache_get(key)
+        if hit is None:
+            hit = legacy_lookup(provider, src, tgt, s)
+            if hit is not None:
+                migrated[key] = hit
+                cache[key] = hit
+        if hit is not None:
+            results[i] = restore_tokens(hit, tokenlists[i])
         else:
-            to_call.append(s)
-            idxs.append(i)
+            if s not in uniq:
+                uniq[s] = len(uniq_list)
+                uniq_list.append(s)
+                uniq_keys.append(key)
+            pending.append(i)
+    if migrated:
+        append_cache(migrated)
 
-    for start in range(0, len(to_call), BATCH_SIZE):
-        part = to_call[start:start + BATCH_SIZE]
-        if not part:
-            continue
-        translated = translator.translate_batch(part)
-        for j, tr in enumerate(translated):
-            i_glob = idxs[start + j]
-            fixed = restore_tokens(tr, tokenlists[i_glob])
-            results[i_glob] = fixed
-            key = cache_key("deepl", translator.src, translator.tgt, prepared[i_glob])
-            cache[key] = fixed
-        save_cache(cache)
-        time.sleep(SLEEP)
+    # Traductions brutes (placeholders §§T..§§ encore présents), indexées comme uniq_list.
+    # Le cache stocke aussi la forme brute : une même chaîne préparée peut porter des tokens
+    # différents selon le segment, restaurés individuellement ci-dessous.
+    raw: List[Union[str, None]] = [None] * len(uniq_list)
+    if uniq_list:
+        await gather_translations(translator, uniq_list, uniq_keys, raw, cache)
+
+    for i in pending:
+        tr = raw[uniq[prepared[i]]]
+        if tr is not None:
+            results[i] = restore_tokens(tr, tokenlists[i])
 
-    return [r if r is not None else "" for r in results]
+    return results
 
 
 # ---------------------- Mappings / Glossaire ----------------------
-# Enums (en contexte)
+# Enums (en contexte) : ENUM_MAP[contexte][valeur]
 ENUM_MAP = {
-    # activities[].type
-    ("activities.type", "damage"): "dégâts",
-    ("activities.type", "save"): "sauvegarde",
-    ("activities.type", "healing"): "soin",
-    ("activities.type", "utility"): "utilitaire",
-
-    # activation.type
-    ("activation.type", "action"): "action",
-    ("activation.type", "bonus"): "action bonus",
-    ("activation.type", "reaction"): "réaction",
-    ("activation.type", "minute"): "minute",
-    ("activation.type", "hour"): "heure",
-    ("activation.type", ""): "",
-
-    # damage.onSave
-    ("damage.onSave", "none"): "aucun",
-    ("damage.onSave", "half"): "moitié",
+    "activities.type": {
+        "damage": "dégâts",
+        "save": "sauvegarde",
+        "healing": "soin",
+        "utility": "utilitaire",
+    },
+    "activation.type": {
+        "action": "action",
+        "bonus": "action bonus",
+        "reaction": "réaction",
+        "minute": "minute",
+        "hour": "heure",
+        "": "",
+    },
+    "damage.onSave": {
+        "none": "aucun",
+        "half": "moitié",
+    },
 }
 
 # Status de conditions : si usage purement "imprimé", c'est OK de traduire
@@ -237,159 +610,253 @@ GLOSSARY_REPLACE = {
 }
 
 
-def apply_glossary_fr(text: str) -> str:
-    out = text
-    for en, fr in GLOSSARY_REPLACE.items():
-        out = out.replace(en, fr)
-    return out
+# Un seul passage pour tout le glossaire : alternance compilée, entrées les plus longues d'abord.
+# Les entrées courtes ("and") ne remplacent que des mots entiers, pas l'intérieur d'un mot.
+GLOSSARY_WHOLE_WORD_MAX = 3
+RE_GLOSSARY = re.compile("|".join(
+    rf"(?<!\w){re.escape(en)}(?!\w)" if len(en) <= GLOSSARY_WHOLE_WORD_MAX else re.escape(en)
+    for en in sorted(GLOSSARY_REPLACE, key=len, reverse=True)
+))
 
 
-# ---------------------- Parcours & collecte ----------------------
-DotPath = str
+def apply_glossary_fr(text: str) -> str:
+    return RE_GLOSSARY.sub(lambda m: GLOSSARY_REPLACE[m.group(0)], text)
 
 
-def should_skip_value(dotpath: DotPath, key: str) -> bool:
-    if key in SKIP_VALUE_KEYS:
-        return True
-    # Si l'un des segments du chemin appartient aux sous-arbres ignorés, on skip tout
-    parts = dotpath.split(".") if dotpath else []
-    if any(p in SKIP_SUBTREES for p in parts):
-        return True
-    return False
+# ---------------------- Parcours & collecte ----------------------
+# Ancre = (conteneur parent, clé ou index) : la réinjection se fait directement, sans re-parcours
+Anchor = Tuple[Union[dict, list], Union[int, str]]
 
 
-def collect_strings(obj: Any, dotpath: DotPath, segments: List[str], anchors: List[Tuple[DotPath, Union[int, str]]]):
+def collect_strings(root: Any, segments: List[str], anchors: List[Anchor]):
     """
-    Parcourt l'objet et collecte tous les strings à traduire.
-    - Exclut les sous-arbres "system" et les clés SKIP_VALUE_KEYS.
+    Parcourt l'objet (pile explicite, sans récursion) et collecte tous les strings à traduire.
+    - Exclut les sous-arbres "system", les clés SKIP_VALUE_KEYS et les valeurs non textuelles.
     - N'exclut PAS "type" (il sera traduit et/ou corrigé via ENUM_MAP).
+    Chaque frame porte skip_depth = nombre d'ancêtres appartenant à SKIP_SUBTREES.
     """
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            child_path = f"{dotpath}.{k}" if dotpath else k
-            if isinstance(v, str):
-                if should_skip_value(dotpath, k):
-                    continue
-                segments.append(v)
-                anchors.append((dotpath, k))
-            else:
-                collect_strings(v, child_path, segments, anchors)
-
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            child_path = f"{dotpath}.{i}" if dotpath else str(i)
-            if isinstance(v, str):
-                parts = dotpath.split(".") if dotpath else []
-                if any(p in SKIP_SUBTREES for p in parts):
-                    continue
-                segments.append(v)
-                anchors.append((dotpath, i))
-            else:
-                collect_strings(v, child_path, segments, anchors)
+    stack: List[Tuple[Any, int]] = [(root, 0)]
+    while stack:
+        obj, skip_depth = stack.pop()
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if isinstance(v, str):
+                    if skip_depth or k in SKIP_VALUE_KEYS or not is_translatable(v):
+                        continue
+                    segments.append(v)
+                    anchors.append((obj, k))
+                elif isinstance(v, (dict, list)):
+                    stack.append((v, skip_depth + (k in SKIP_SUBTREES)))
+
+        elif isinstance(obj, list):
+            for i, v in enumerate(obj):
+                if isinstance(v, str):
+                    if skip_depth or not is_translatable(v):
+                        continue
+                    segments.append(v)
+                    anchors.append((obj, i))
+                elif isinstance(v, (dict, list)):
+                    stack.append((v, skip_depth))
 
 
-def set_translated(root: Any, dotpath: DotPath, key_or_idx: Union[str, int], value: str):
-    """Réinjecte la valeur traduite au bon endroit du document (dict ou list)."""
-    if dotpath == "":
-        parent = root
-    else:
-        parent = root
-        for p in dotpath.split("."):
-            if p == "":
-                continue
-            if p.isdigit():
-                parent = parent[int(p)]
-            else:
-                parent = parent[p]
-    if isinstance(key_or_idx, int):
-        parent[key_or_idx] = value
-    else:
-        parent[key_or_idx] = value
+# ---------------------- Post-traitements ----------------------
+# Contexte hérité lors du parcours : bits des clés ancêtres qui conditionnent les post-traitements
+CTX_ACTIVITIES = 1
+CTX_ACTIVATION = 2
+CTX_DAMAGE = 4
+CTX_EFFECTS = 8
+CTX_BITS = {
+    "activities": CTX_ACTIVITIES,
+    "activation": CTX_ACTIVATION,
+    "damage": CTX_DAMAGE,
+    "effects": CTX_EFFECTS,
+}
 
 
-# ---------------------- Post-traitements ----------------------
-def walk_and_postprocess(obj: Any, dotpath: DotPath = ""):
+def walk_and_postprocess(root: Any):
     """
-    Post-process :
+    Post-process (pile explicite, sans récursion) :
     - enums (type, activation.type, damage.onSave) via ENUM_MAP
     - statuses via STATUS_MAP
     - glossaire FR (name, description, et dans listes d'effets/activités)
+    Chaque frame porte ctx (clés ancêtres, noeud inclus) et parent_ctx (noeud exclu).
     """
-    if isinstance(obj, dict):
-        for k, v in list(obj.items()):
-            child = f"{dotpath}.{k}" if dotpath else k
-
-            # a) ENUMS en contexte
-            if k == "type" and isinstance(v, str):
-                # activities.type
-                if dotpath.endswith(".activities") or ".activities." in dotpath:
-                    obj[k] = ENUM_MAP.get(("activities.type", v), v)
-                # activation.type
-                if dotpath.endswith(".activation") or ".activation." in dotpath:
-                    obj[k] = ENUM_MAP.get(("activation.type", v), obj[k])
-
-            if k == "onSave" and isinstance(v, str) and ".damage" in dotpath:
-                obj[k] = ENUM_MAP.get(("damage.onSave", v), v)
-
-            # b) STATUSES -> mapping FR
-            if k == "statuses" and isinstance(v, list):
-                obj[k] = [STATUS_MAP.get(s, s) for s in v]
-
-            # c) Glossaire FR pour name/description
-            if isinstance(v, str) and k in {"name", "description"}:
-                obj[k] = apply_glossary_fr(v)
-
-            # récurrence
-            walk_and_postprocess(v, child)
-
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            child = f"{dotpath}.{i}" if dotpath else str(i)
-            if isinstance(v, str):
-                if any(seg in dotpath for seg in (".effects.", ".activities.")):
-                    obj[i] = apply_glossary_fr(v)
-            walk_and_postprocess(v, child)
+    activities_type = ENUM_MAP["activities.type"]
+    activation_type = ENUM_MAP["activation.type"]
+    damage_on_save = ENUM_MAP["damage.onSave"]
+    stack: List[Tuple[Any, int, int]] = [(root, 0, 0)]
+    while stack:
+        obj, ctx, parent_ctx = stack.pop()
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                # a) ENUMS en contexte
+                if k == "type" and isinstance(v, str):
+                    # activities.type
+                    if ctx & CTX_ACTIVITIES:
+                        obj[k] = activities_type.get(v, v)
+                    # activation.type
+                    if ctx & CTX_ACTIVATION:
+                        obj[k] = activation_type.get(v, obj[k])
+
+                if k == "onSave" and isinstance(v, str) and ctx & CTX_DAMAGE:
+                    obj[k] = damage_on_save.get(v, v)
+
+                # b) STATUSES -> mapping FR
+                if k == "statuses" and isinstance(v, list):
+                    obj[k] = [STATUS_MAP.get(s, s) for s in v]
+
+                # c) Glossaire FR pour name/description
+                if isinstance(v, str) and k in {"name", "description"}:
+                    obj[k] = apply_glossary_fr(v)
+
+                if isinstance(v, (dict, list)):
+                    stack.append((v, ctx | CTX_BITS.get(k, 0), ctx))
+
+        elif isinstance(obj, list):
+            # strings d'une liste située sous effects[...] / activities[...]
+            in_effects_or_activities = parent_ctx & (CTX_EFFECTS | CTX_ACTIVITIES)
+            for i, v in enumerate(obj):
+                if isinstance(v, str):
+                    if in_effects_or_activities:
+                        obj[i] = apply_glossary_fr(v)
+                elif isinstance(v, (dict, list)):
+                    stack.append((v, ctx, ctx))
 
 
 # ---------------------- Pipeline principal ----------------------
-def process_file(in_path: str, out_path: str):
-    data = json.loads(Path(in_path).read_text(encoding="utf-8"))
-    if not isinstance(data, list):
-        raise RuntimeError("Le JSON racine doit être une liste (array).")
-
-    translator = make_translator()
-    cache = load_cache()
-
+def spell_fingerprint(sp: Dict[str, Any], src: str, tgt: str) -> str:
+    """Empreinte du sort source (clés triées, sans _src_hash) pour la paire de langues."""
+    sp = {k: v for k, v in sp.items() if k != SRC_HASH_KEY}
+    if orjson is not None:
+        raw = orjson.dumps(sp, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    else:
+        raw = json.dumps(sp, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    h = hashlib.blake2b(f"{src}|{tgt}|".encode("utf-8"), digest_size=16)
+    h.update(raw)
+    return h.hexdigest()
+
+
+def load_prior_output(path: Union[str, Path]) -> Dict[str, Any]:
+    """Sorts d'une sortie précédente indexés par _src_hash (vide si absente ou illisible)."""
+    prior: Dict[str, Any] = {}
+    if not Path(path).exists():
+        return prior
+    try:
+        for sp in iter_json_array(path):
+            if isinstance(sp, dict) and isinstance(sp.get(SRC_HASH_KEY), str):
+                prior[sp[SRC_HASH_KEY]] = sp
+    except Exception:
+        pass  # sortie tronquée ou d'un autre format : on garde ce qui a pu être lu
+    return prior
+
+
+class PreparedGroup(NamedTuple):
+    """Groupe de sorts lu et préparé hors de la boucle réseau (prepare_group)."""
+    spells: List[Any]  # groupe à écrire, dans l'ordre d'entrée
+    fresh: List[Any]  # sorts à traduire (les autres sont repris de la sortie précédente)
+    segments: List[str]
+    anchors: List[Anchor]
+    unique: List[str]  # segments distincts non vides...
+    prepared: List[str]  # ... passés par prepare_segments (mêmes index que unique)
+    tokenlists: List[List[str]]
+
+
+def prepare_group(spells: List[Any], fresh: List[Any]) -> PreparedGroup:
+    """Toutes les étapes sans réseau avant la traduction des sorts `fresh` d'un groupe."""
     # 1) Capturer name_en AVANT toute traduction
-    for sp in data:
+    for sp in fresh:
         if isinstance(sp, dict) and isinstance(sp.get("name"), str):
             if not sp.get("name_en"):
                 sp["name_en"] = sp["name"]
 
     # 2) Collecter tous les strings à traduire (hors parties techniques)
     segments: List[str] = []
-    anchors: List[Tuple[DotPath, Union[int, str]]] = []
-    collect_strings(data, "", segments, anchors)
+    anchors: List[Anchor] = []
+    collect_strings(fresh, segments, anchors)
+
+    # 3a) Chaque chaîne distincte n'est préparée (et traduite) qu'une fois
+    #     ("1 action", "V, S", écoles... reviennent dans presque chaque sort ; d'un groupe
+    #     à l'autre, c'est le cache qui évite de les renvoyer)
+    unique = list(dict.fromkeys(s for s in segments if s))
+    prepared, tokenlists = prepare_segments(unique)
+    return PreparedGroup(spells, fresh, segments, anchors, unique, prepared, tokenlists)
+
 
-    # 3) Traduire par lots
-    print(f"Segments à traduire: {len(segments)}")
-    translated: List[str] = []
-    for start in tqdm(range(0, len(segments), BATCH_SIZE)):
-        part = segments[start:start + BATCH_SIZE]
-        translated.extend(translate_segments(translator, part, cache))
+async def translate_group(translator: DeepLTranslator, g: PreparedGroup, cache: Cache) -> None:
+    """Traduit en place les sorts d'un groupe préparé par prepare_group."""
+    # 3b) Traduire par lots (requêtes concurrentes)
+    translated = await translate_segments(translator, g.prepared, g.tokenlists, cache)
+    mapping = dict(zip(g.unique, translated))
 
     # 4) Réinjecter
-    it = iter(translated)
-    for (dotpath, key_or_idx) in anchors:
-        set_translated(data, dotpath, key_or_idx, next(it))
+    for (parent, key), value in zip(g.anchors, g.segments):
+        parent[key] = mapping.get(value, "")
 
     # 5) Post-traitements : enums, statuses, glossaire
-    walk_and_postprocess(data)
+    walk_and_postprocess(g.fresh)
+
+
+def process_file(in_path: str, out_path: str):
+    asyncio.run(process_file_async(in_path, out_path))
 
-    # 6) Écrire
-    Path(out_path).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    save_cache(cache)
-    print(f"OK: {out_path} (objets: {len(data)})")
+
+async def process_file_async(in_path: str, out_path: str):
+    translator = make_translator()
+    cache = load_cache()
+    prior = load_prior_output(out_path)
+    spells = iter_json_array(in_path)
+    count = n_segments = reused = 0
+
+    def _read_group() -> PreparedGroup:
+        group = list(itertools.islice(spells, GROUP_SIZE))
+        fresh: List[Any] = []
+        for i, sp in enumerate(group):
+            if isinstance(sp, dict):
+                h = spell_fingerprint(sp, translator.src, translator.tgt)
+                if h in prior:
+                    group[i] = prior[h]  # inchangé : déjà traduit au run précédent
+                    continue
+                sp[SRC_HASH_KEY] = h
+            fresh.append(sp)
+        return prepare_group(group, fresh)
+
+    # Producteur / consommateur : le groupe suivant est lu et entièrement préparé (empreintes,
+    # collecte, normalisation, protection des tokens) dans un thread pendant que le groupe
+    # courant attend DeepL. Les traductions restent séquentielles d'un groupe
+    # à l'autre, pour que le cache serve les chaînes déjà vues au lieu de les renvoyer.
+    next_group = None
+
+    # Écriture au fil des groupes dans un fichier temporaire (in_path peut être out_path)
+    tmp = Path(out_path).with_name(Path(out_path).name + ".tmp")
+    try:
+        async with translator:
+            # Une seule barre pour tout le run, avancée par groupe écrit (total inconnu : lecture en flux)
+            with open(tmp, "wb") as out, tqdm(unit=" sorts") as bar:
+                next_group = asyncio.ensure_future(asyncio.to_thread(_read_group))
+                while True:
+                    g = await next_group
+                    if not g.spells:
+                        break
+                    next_group = asyncio.ensure_future(asyncio.to_thread(_read_group))
+                    await translate_group(translator, g, cache)
+                    n_segments += len(g.segments)
+                    reused += len(g.spells) - len(g.fresh)
+                    for sp in g.spells:
+                        out.write(b",\n" if count else b"[\n")
+                        out.write(json_array_item(sp))
+                        count += 1
+                    bar.update(len(g.spells))
+                out.write(b"\n]" if count else b"[]")
+        os.replace(tmp, out_path)
+    finally:
+        if next_group is not None:
+            # Une lecture encore en cours doit finir avant de quitter (résultat ignoré)
+            await asyncio.gather(next_group, return_exceptions=True)
+        tmp.unlink(missing_ok=True)
+        # Snapshot unique par run, même interrompu (les lots déjà payés sont dans le journal)
+        save_cache(cache)
+    print(f"Segments traduits: {n_segments} (sorts repris du run précédent : {reused})")
+    print(f"OK: {out_path} (objets: {count})")
 
 
 # ---------------------- CLI ----------------------
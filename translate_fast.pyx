@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Version Cython (optionnelle) des fonctions de texte chaudes de translate.py :
+protect_tokens, restore_tokens, norm_ws.
+
+Même comportement que les versions Python (RE_TOKEN, placeholders §§T{i}§§),
+mais avec un scanner écrit à la main au lieu de regex + callback Python.
+translate.py l'importe s'il est compilé, sinon garde ses versions pures Python.
+
+Compilation (dans le dossier du projet) :
+> pip install cython
+> cythonize -i translate_fast.pyx
+"""
+
+# Au moins un de ces caractères est nécessaire pour qu'un token soit présent
+cdef frozenset TOKEN_CHARS = frozenset(u"[{@/0123456789")
+
+
+cdef inline bint _is_word(Py_UCS4 c):
+    # équivalent de \w (str) pour le module re
+    return c == u'_' or c.isalnum()
+
+
+cdef inline bint _is_ascii_alpha(Py_UCS4 c):
+    return (u'a' <= c <= u'z') or (u'A' <= c <= u'Z')
+
+
+cdef inline bint _is_at_char(Py_UCS4 c):
+    # [A-Za-z0-9_.\[\]-]
+    return (_is_ascii_alpha(c) or (u'0' <= c <= u'9') or c == u'_' or c == u'.'
+            or c == u'[' or c == u']' or c == u'-')
+
+
+cdef Py_ssize_t _match_block(str text, Py_ssize_t i, Py_ssize_t n):
+    # \[\[.*?\]\]  ('.' ne traverse pas les sauts de ligne)
+    cdef Py_ssize_t j
+    if i + 1 >= n or text[i + 1] != u'[':
+        return -1
+    j = i + 2
+    while j + 1 < n:
+        if text[j] == u'\n':
+            return -1
+        if text[j] == u']' and text[j + 1] == u']':
+            return j + 2
+        j += 1
+    return -1
+
+
+cdef Py_ssize_t _match_tag(str text, Py_ssize_t i, Py_ssize_t n):
+    # {@[^{}]+}
+    cdef Py_ssize_t j
+    cdef Py_UCS4 c
+    if i + 1 >= n or text[i + 1] != u'@':
+        return -1
+    j = i + 2
+    while j < n:
+        c = text[j]
+        if c == u'}':
+            return j + 1 if j > i + 2 else -1
+        if c == u'{':
+            return -1
+        j += 1
+    return -1
+
+
+cdef Py_ssize_t _match_at(str text, Py_ssize_t i, Py_ssize_t n):
+    # @[A-Za-z0-9_.\[\]-]+
+    cdef Py_ssize_t j = i + 1
+    while j < n and _is_at_char(text[j]):
+        j += 1
+    return j if j > i + 1 else -1
+
+
+cdef Py_ssize_t _digits(str text, Py_ssize_t j, Py_ssize_t n):
+    while j < n and text[j].isdecimal():
+        j += 1
+    return j
+
+
+cdef Py_ssize_t _match_dice(str text, Py_ssize_t i, Py_ssize_t n):
+    # \b\d+d\d+([+-]\d+)?\b
+    cdef Py_ssize_t j, k, m
+    if i > 0 and _is_word(text[i - 1]):
+        return -1
+    j = _digits(text, i, n)
+    if j >= n or text[j] != u'd':
+        return -1
+    k = _digits(text, j + 1, n)
+    if k == j + 1:
+        return -1
+    if k < n and (text[k] == u'+' or text[k] == u'-'):
+        m = _digits(text, k + 1, n)
+        if m > k + 1 and (m >= n or not _is_word(text[m])):
+            return m
+    if k >= n or not _is_word(text[k]):
+        return k
+    return -1
+
+
+cdef Py_ssize_t _match_command(str text, Py_ssize_t i, Py_ssize_t n):
+    # /[a-zA-Z]+
+    cdef Py_ssize_t j = i + 1
+    while j < n and _is_ascii_alpha(text[j]):
+        j += 1
+    return j if j > i + 1 else -1
+
+
+cpdef tuple protect_tokens(str text):
+    if TOKEN_CHARS.isdisjoint(text):
+        return text, []
+    cdef list tokens = []
+    cdef list parts = []
+    cdef Py_ssize_t n = len(text)
+    cdef Py_ssize_t i = 0, last = 0, end
+    cdef Py_UCS4 c
+    while i < n:
+        c = text[i]
+        if c == u'[':
+            end = _match_block(text, i, n)
+        elif c == u'{':
+            end = _match_tag(text, i, n)
+        elif c == u'@':
+            end = _match_at(text, i, n)
+        elif c == u'/':
+            end = _match_command(text, i, n)
+        elif c.isdecimal():
+            end = _match_dice(text, i, n)
+        else:
+            end = -1
+        if end < 0:
+            i += 1
+            continue
+        parts.append(text[last:i])
+        parts.append(u"§§T%d§§" % len(tokens))
+        tokens.append(text[i:end])
+        i = last = end
+    if not tokens:
+        return text, tokens
+    parts.append(text[last:])
+    return u"".join(parts), tokens
+
+
+cpdef str restore_tokens(str text, list tokens):
+    # §§T(0|[1-9][0-9]*)§§ -> tokens[i] en une passe ; index hors limites laissé tel quel
+    cdef Py_ssize_t ntok = len(tokens)
+    if not ntok:
+        return text
+    cdef Py_ssize_t n = len(text)
+    cdef Py_ssize_t i = 0, last = 0, j, k, idx
+    cdef list parts = []
+    cdef Py_UCS4 c
+    while True:
+        i = text.find(u"§§T", i)
+        if i < 0:
+            break
+        j = k = i + 3
+        idx = 0
+        while k < n:
+            c = text[k]
+            if not (u'0' <= c <= u'9'):
+                break
+            if k - j < 18:  # au-delà, forcément hors limites (et évite le débordement)
+                idx = idx * 10 + (<Py_ssize_t>c - 48)
+            k += 1
+        if (k == j or (text[j] == u'0' and k > j + 1)
+                or k + 1 >= n or text[k] != u'§' or text[k + 1] != u'§'):
+            i += 1
+            continue
+        if k - j <= 18 and idx < ntok:
+            parts.append(text[last:i])
+            parts.append(tokens[idx])
+            last = k + 2
+        i = k + 2
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return u"".join(parts)
+
+
+cpdef str norm_ws(str s):
+    # [ \t]+ -> " " après \r\n -> \n, puis strip()
+    if u"\r" in s:
+        s = s.replace(u"\r\n", u"\n")
+    cdef Py_ssize_t n = len(s)
+    cdef Py_ssize_t i = 0, j, start = 0
+    cdef list parts = []
+    cdef Py_UCS4 c
+    while i < n:
+        c = s[i]
+        if c == u' ' or c == u'\t':
+            j = i + 1
+            while j < n and (s[j] == u' ' or s[j] == u'\t'):
+                j += 1
+            if j > i + 1 or c == u'\t':
+                parts.append(s[start:i])
+                parts.append(u" ")
+                start = j
+            i = j
+        else:
+            i += 1
+    if not parts:
+        return s.strip()
+    parts.append(s[start:])
+    return u"".join(parts).strip()